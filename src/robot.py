@@ -67,13 +67,14 @@ class Robot(wpilib.TimedRobot):
         self.questnav_bridge.on_teleop_enable()
 
     def teleopPeriodic(self):
-        self.questnav_bridge.update()
+        # QuestNav publishing runs on the bridge's own worker thread.
+        # Bail out before reading the controller when there's no drive to feed.
+        if self.drive is None or self._drive_faulted or not self.drive.enabled:
+            return
         # Right stick controls translation; left X controls robot rotation.
         x_displacement = -self.driver_controller.getRightY()
         y_displacement = -self.driver_controller.getRightX()
         rotation = -self.driver_controller.getLeftX()
-        if self.drive is None or self._drive_faulted:
-            return
 
         try:
             self.drive.drive(
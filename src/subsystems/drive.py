@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import importlib
+import importlib.util
 from typing import TYPE_CHECKING, Callable
 
 from commands2 import Command, InstantCommand
@@ -30,110 +31,202 @@ else:
     _PHOENIX_IMPORT_ERROR = None
 
 
+def _resolve_first_callable(
+    candidates: tuple[tuple[str, str], ...],
+) -> Callable[..., object] | None:
+    for module_name, attr_name in candidates:
+        try:
+            if importlib.util.find_spec(module_name) is None:
+                continue
+        except ModuleNotFoundError:
+            # Parent package (e.g. "generated") does not exist.
+            continue
+
+        try:
+            attr = getattr(importlib.import_module(module_name), attr_name, None)
+        except Exception as exc:
+            # A present-but-broken module (e.g. generated code importing a
+            # missing vendor library) must not take the drive down with it.
+            wpilib.reportWarning(
+                f"Found {module_name} but failed to import it: {exc}", False
+            )
+            continue
+        if callable(attr):
+            return attr
+    return None
+
+
+# Tuner-generated projects often place these in one of the listed modules.
+_TUNER_DRIVETRAIN_CANDIDATES = (
+    ("generated.command_swerve_drivetrain", "CommandSwerveDrivetrain"),
+    ("subsystems.command_swerve_drivetrain", "CommandSwerveDrivetrain"),
+    ("command_swerve_drivetrain", "CommandSwerveDrivetrain"),
+)
+_TUNER_AUTO_FACTORY_CANDIDATES = (
+    ("subsystems.tuner_autonomous", "build_autonomous_command"),
+    ("generated.tuner_autonomous", "build_autonomous_command"),
+    ("tuner_autonomous", "build_autonomous_command"),
+)
+
+# Resolved on the first Drive() construction (which robot.py guards) and cached
+# here so later constructions skip the module probing.
+_tuner_hooks_resolved = False
+_TUNER_DRIVETRAIN_CLS: Callable[..., object] | None = None
+_TUNER_AUTO_FACTORY: Callable[..., object] | None = None
+
+
+def _resolve_tuner_hooks() -> None:
+    global _tuner_hooks_resolved, _TUNER_DRIVETRAIN_CLS, _TUNER_AUTO_FACTORY
+    if _tuner_hooks_resolved:
+        return
+    _TUNER_DRIVETRAIN_CLS = _resolve_first_callable(_TUNER_DRIVETRAIN_CANDIDATES)
+    _TUNER_AUTO_FACTORY = _resolve_first_callable(_TUNER_AUTO_FACTORY_CANDIDATES)
+    _tuner_hooks_resolved = True
+
+
+def _swerve_mix(
+    x: float,
+    y: float,
+    omega: float,
+    translation_deadband: float,
+    rotation_deadband: float,
+    translation_scale: float,
+    rotation_scale: float,
+) -> tuple[float, float, float, float, float]:
+    """
+    Open-loop bring-up mix while waiting on full swerve request wiring.
+
+    Returns (front left, front right, back left, back right, steer) outputs,
+    each clamped to [-1, 1]. Deadband and clamp are inlined since this runs
+    every teleop cycle.
+    """
+    x = (x if abs(x) >= translation_deadband else 0.0) * translation_scale
+    y = (y if abs(y) >= translation_deadband else 0.0) * translation_scale
+    omega = (omega if abs(omega) >= rotation_deadband else 0.0) * rotation_scale
+
+    return (
+        max(-1.0, min(1.0, x + y + omega)),
+        max(-1.0, min(1.0, x - y - omega)),
+        max(-1.0, min(1.0, x - y + omega)),
+        max(-1.0, min(1.0, x + y - omega)),
+        max(-1.0, min(1.0, omega)),
+    )
+
+
 class Drive:
     def __init__(self, scheduler: CommandScheduler | None = None):
+        _resolve_tuner_hooks()
         self.scheduler = scheduler
         self._enabled = True
         self._disable_reason: str | None = None
         self._disable_reported = False
         self.tuner_drivetrain: object | None = None
+        self._tuner_drive: Callable[..., object] | None = None
+        # Mixer tuning, bound here so drive() skips the class attribute lookups.
+        self._tdb = DriveConstants.TRANSLATION_DEADBAND
+        self._rdb = DriveConstants.ROTATION_DEADBAND
+        self._tscale = DriveConstants.MAX_TRANSLATION_OUTPUT
+        self._rscale = DriveConstants.MAX_ROTATION_OUTPUT
         self._autonomous_factory: Callable[..., Command] | None = (
-            self._try_create_tuner_auto_factory()
+            _TUNER_AUTO_FACTORY  # type: ignore[assignment]
         )
         self.drive_motors: list[TalonFXType] = []
         self.steer_motors: list[TalonFXType] = []
+        # One reusable control request per motor; set_control() is fed the same
+        # object every cycle with only its output rewritten.
+        self._drive_requests: list[DutyCycleOutType] = []
+        self._steer_requests: list[DutyCycleOutType] = []
 
         if TalonFXImpl is None or DutyCycleOutImpl is None:
             self._disable(
-                "Phoenix 6 is not available; running with swerve drive disabled."
+                lambda: "Phoenix 6 is not available; running with swerve drive disabled."
             )
             return
 
         self.tuner_drivetrain = self._try_create_tuner_drivetrain()
+        # If your Tuner drivetrain exposes a drive(...) function, prefer it.
+        # Which path applies can't change after construction, so pick it once.
+        tuner_drive = getattr(self.tuner_drivetrain, "drive", None)
+        if callable(tuner_drive):
+            self._tuner_drive = tuner_drive
+            self.drive = self._drive_via_tuner  # type: ignore[method-assign]
         self._init_hardware()
 
-    def _disable(self, reason: str) -> None:
+    @property
+    def enabled(self) -> bool:
+        """False once the subsystem has disabled itself; drive() is then a no-op."""
+        return self._enabled
+
+    def _disable(self, reason_fn: Callable[[], str]) -> None:
+        # The reason is built lazily so repeat disables skip the string formatting.
         self._enabled = False
-        self._disable_reason = reason
-        if not self._disable_reported:
-            self._disable_reported = True
-            wpilib.reportWarning(reason, False)
+        if self._disable_reported:
+            return
+        self._disable_reported = True
+        self._disable_reason = reason_fn()
+        wpilib.reportWarning(self._disable_reason, False)
 
     def _init_hardware(self) -> None:
-        if TalonFXImpl is None:
-            self._disable("Phoenix 6 TalonFX class unavailable; swerve drive disabled.")
+        if TalonFXImpl is None or DutyCycleOutImpl is None:
+            self._disable(
+                lambda: "Phoenix 6 TalonFX class unavailable; swerve drive disabled."
+            )
             return
 
-        for module in DriveConstants.MODULES:
+        for drive_id, steer_id in DriveConstants.MODULE_IDS:
             try:
                 self.drive_motors.append(
-                    TalonFXImpl(module.drive_motor_id, DriveConstants.CANBUS_NAME)
+                    TalonFXImpl(drive_id, DriveConstants.CANBUS_NAME)
                 )
                 self.steer_motors.append(
-                    TalonFXImpl(module.steer_motor_id, DriveConstants.CANBUS_NAME)
+                    TalonFXImpl(steer_id, DriveConstants.CANBUS_NAME)
                 )
+                self._drive_requests.append(DutyCycleOutImpl(0.0))
+                self._steer_requests.append(DutyCycleOutImpl(0.0))
             except Exception as exc:
                 self.drive_motors.clear()
                 self.steer_motors.clear()
+                self._drive_requests.clear()
+                self._steer_requests.clear()
                 self._disable(
-                    f"Failed to initialize swerve hardware on CAN bus "
+                    lambda: f"Failed to initialize swerve hardware on CAN bus "
                     f"'{DriveConstants.CANBUS_NAME}': {exc}"
                 )
                 return
 
     def _try_create_tuner_drivetrain(self) -> object | None:
-        # Tuner-generated projects often place this class in one of these modules.
-        candidates = (
-            ("generated.command_swerve_drivetrain", "CommandSwerveDrivetrain"),
-            ("subsystems.command_swerve_drivetrain", "CommandSwerveDrivetrain"),
-            ("command_swerve_drivetrain", "CommandSwerveDrivetrain"),
-        )
-        for module_name, class_name in candidates:
-            try:
-                module = importlib.import_module(module_name)
-            except ModuleNotFoundError:
-                continue
-
-            drivetrain_type = getattr(module, class_name, None)
-            if drivetrain_type is None:
-                continue
-
-            try:
-                return drivetrain_type()
-            except Exception as exc:  # pragma: no cover - depends on generated code
-                wpilib.reportWarning(
-                    f"Found {module_name}.{class_name} but failed to construct it: {exc}",
-                    False,
-                )
-                return None
-        return None
-
-    def _try_create_tuner_auto_factory(self) -> Callable[..., Command] | None:
-        candidates = (
-            ("subsystems.tuner_autonomous", "build_autonomous_command"),
-            ("generated.tuner_autonomous", "build_autonomous_command"),
-            ("tuner_autonomous", "build_autonomous_command"),
-        )
-        for module_name, fn_name in candidates:
-            try:
-                module = importlib.import_module(module_name)
-            except ModuleNotFoundError:
-                continue
-
-            factory = getattr(module, fn_name, None)
-            if callable(factory):
-                return factory
-        return None
+        if _TUNER_DRIVETRAIN_CLS is None:
+            return None
+        try:
+            return _TUNER_DRIVETRAIN_CLS()
+        except Exception as exc:  # pragma: no cover - depends on generated code
+            wpilib.reportWarning(
+                f"Found {_TUNER_DRIVETRAIN_CLS!r} but failed to construct it: {exc}",
+                False,
+            )
+            return None
 
-    def _apply_deadband(self, value: float, deadband: float) -> float:
-        if abs(value) < deadband:
-            return 0.0
-        return value
+    def _drive_via_tuner(
+        self,
+        x_displacement: float,
+        y_displacement: float,
+        rotation: float,
+        field_oriented: bool = False,
+    ) -> None:
+        if not self._enabled or self._tuner_drive is None:
+            return
 
-    def _clamp(self, value: float) -> float:
-        return max(-1.0, min(1.0, value))
+        try:
+            self._tuner_drive(x_displacement, y_displacement, rotation, field_oriented)
+        except TypeError:
+            # Signature mismatch; fall back to the open-loop mix.
+            self._drive_open_loop(
+                x_displacement, y_displacement, rotation, field_oriented
+            )
+        except Exception as exc:
+            self._disable(lambda: f"Tuner drivetrain drive call failed: {exc}")
 
-    def drive(
+    def _drive_open_loop(
         self,
         x_displacement: float,
         y_displacement: float,
@@ -143,71 +236,53 @@ class Drive:
         if not self._enabled:
             return
 
-        if self.tuner_drivetrain is not None:
-            # If your Tuner drivetrain exposes a drive(...) function, prefer it.
-            tuner_drive = getattr(self.tuner_drivetrain, "drive", None)
-            if callable(tuner_drive):
-                try:
-                    tuner_drive(
-                        x_displacement, y_displacement, rotation, field_oriented
-                    )
-                    return
-                except TypeError:
-                    pass
-                except Exception as exc:
-                    self._disable(f"Tuner drivetrain drive call failed: {exc}")
-                    return
-
-        x = self._apply_deadband(x_displacement, DriveConstants.TRANSLATION_DEADBAND)
-        y = self._apply_deadband(y_displacement, DriveConstants.TRANSLATION_DEADBAND)
-        omega = self._apply_deadband(rotation, DriveConstants.ROTATION_DEADBAND)
-
-        x *= DriveConstants.MAX_TRANSLATION_OUTPUT
-        y *= DriveConstants.MAX_TRANSLATION_OUTPUT
-        omega *= DriveConstants.MAX_ROTATION_OUTPUT
-
-        # Open-loop bring-up mix while waiting on full swerve request wiring.
-        drive_outputs = (
-            self._clamp(x + y + omega),  # front left
-            self._clamp(x - y - omega),  # front right
-            self._clamp(x - y + omega),  # back left
-            self._clamp(x + y - omega),  # back right
+        front_left, front_right, back_left, back_right, steer_output = _swerve_mix(
+            x_displacement,
+            y_displacement,
+            rotation,
+            self._tdb,
+            self._rdb,
+            self._tscale,
+            self._rscale,
         )
-        if DutyCycleOutImpl is None:
-            self._disable("Phoenix 6 DutyCycleOut unavailable during drive call.")
-            return
-
-        for motor, output in zip(self.drive_motors, drive_outputs):
-            try:
-                motor.set_control(DutyCycleOutImpl(output))
-            except Exception as exc:
-                self._disable(f"Swerve drive output failed: {exc}")
-                return
-
-        # Steer motors are initialized and controlled directly for basic validation.
-        steer_output = self._clamp(omega)
-        for motor in self.steer_motors:
-            try:
-                motor.set_control(DutyCycleOutImpl(steer_output))
-            except Exception as exc:
-                self._disable(f"Swerve steer output failed: {exc}")
-                return
+        drive_outputs = (front_left, front_right, back_left, back_right)
+
+        # Fill every request first so the CAN writes go out back to back.
+        for request, output in zip(self._drive_requests, drive_outputs):
+            request.output = output
+        for request in self._steer_requests:
+            request.output = steer_output
+
+        # Any write failure disables the subsystem wholesale, so one handler
+        # covers both motor groups.
+        try:
+            for motor, request in zip(self.drive_motors, self._drive_requests):
+                motor.set_control(request)
+            # Steer motors are initialized and controlled directly for basic validation.
+            for motor, request in zip(self.steer_motors, self._steer_requests):
+                motor.set_control(request)
+        except Exception as exc:
+            self._disable(lambda: f"Swerve drive/steer output failed: {exc}")
+
+    # Rebound to _drive_via_tuner in __init__ when a Tuner drivetrain drive() exists.
+    drive = _drive_open_loop
 
     def stop(self) -> None:
-        if DutyCycleOutImpl is None:
-            return
-        for motor in self.drive_motors:
-            try:
-                motor.set_control(DutyCycleOutImpl(0.0))
-            except Exception as exc:
-                self._disable(f"Swerve stop failed on drive motor: {exc}")
-                return
-        for motor in self.steer_motors:
-            try:
-                motor.set_control(DutyCycleOutImpl(0.0))
-            except Exception as exc:
-                self._disable(f"Swerve stop failed on steer motor: {exc}")
-                return
+        # No Phoenix guard needed: without it __init__ disables the subsystem
+        # and the request lists stay empty. stop() deliberately ignores
+        # _enabled so it still tries to zero motors after a drive fault.
+        for request in self._drive_requests:
+            request.output = 0.0
+        for request in self._steer_requests:
+            request.output = 0.0
+
+        try:
+            for motor, request in zip(self.drive_motors, self._drive_requests):
+                motor.set_control(request)
+            for motor, request in zip(self.steer_motors, self._steer_requests):
+                motor.set_control(request)
+        except Exception as exc:
+            self._disable(lambda: f"Swerve stop failed: {exc}")
 
     def get_autonomous_command(self) -> Command:
         if not self._enabled:
@@ -219,7 +294,9 @@ class Drive:
                 try:
                     command = getter()
                 except Exception as exc:
-                    self._disable(f"Tuner drivetrain autonomous getter failed: {exc}")
+                    self._disable(
+                        lambda: f"Tuner drivetrain autonomous getter failed: {exc}"
+                    )
                     return InstantCommand(lambda: None)
                 if command is not None and hasattr(command, "schedule"):
                     return command
@@ -231,10 +308,12 @@ class Drive:
                 try:
                     command = self._autonomous_factory(self)  # type: ignore[misc]
                 except Exception as exc:
-                    self._disable(f"Autonomous factory invocation failed: {exc}")
+                    self._disable(
+                        lambda: f"Autonomous factory invocation failed: {exc}"
+                    )
                     return InstantCommand(lambda: None)
             except Exception as exc:
-                self._disable(f"Autonomous factory invocation failed: {exc}")
+                self._disable(lambda: f"Autonomous factory invocation failed: {exc}")
                 return InstantCommand(lambda: None)
 
             if command is not None and hasattr(command, "schedule"):
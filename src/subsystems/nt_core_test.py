@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import math
+import threading
 import time
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from typing import Any
 
 import ntcore
 import wpilib
@@ -9,6 +12,28 @@ from wpimath.geometry import Pose2d, Pose3d, Rotation2d, Rotation3d, Translation
 
 from utils.constants import QuestNavConstants
 
+_DEG_TO_RAD = math.pi / 180.0
+
+# Reasonable REBUILT 2026 default in WPILib/AdvantageScope 'Blue Wall' coordinates:
+#   x=1.00m, y=fieldWidth/2, heading=0deg (facing +X, toward red).
+_FIELD_WIDTH_M = 8.07  # from 2026 manual (~8.07m)
+_DEFAULT_X_M = 1.00
+_DEFAULT_Y_M = _FIELD_WIDTH_M / 2.0
+_DEFAULT_POSE2D = Pose2d(_DEFAULT_X_M, _DEFAULT_Y_M, Rotation2d.fromDegrees(0.0))
+_DEFAULT_POSE3D = Pose3d(
+    Translation3d(_DEFAULT_X_M, _DEFAULT_Y_M, 0.0), Rotation3d(0.0, 0.0, 0.0)
+)
+_DEFAULT_POSE_ARRAY = [_DEFAULT_X_M, _DEFAULT_Y_M, 0.0]
+
+# Rate-limited warning slots, indexing QuestNavNtBridge._last_warning_ns.
+_WARN_READ = 0
+_WARN_POSE = 1
+_WARN_POSITION_LEN = 2
+_WARN_EULER_LEN = 3
+_WARN_QUAT_LEN = 4
+_WARN_UPDATE = 5
+_WARN_COUNT = 6
+
 
 class QuestNavNtBridge:
     def __init__(
@@ -18,8 +43,21 @@ class QuestNavNtBridge:
     ) -> None:
         self._nt_instance = nt_instance or ntcore.NetworkTableInstance.getDefault()
         self._stale_timeout_s = stale_timeout_s
-        self._warning_interval_s = 1.0
-        self._last_warning_s: dict[str, float] = {}
+        self._warning_interval_ns = 1_000_000_000
+        # Indexed by the _WARN_* slots; seeded one interval in the past so the
+        # first occurrence of each warning is always reported.
+        self._last_warning_ns = [-self._warning_interval_ns] * _WARN_COUNT
+        # Last Quest sample fully processed by update(); repeats of it only
+        # refresh DataAgeSec/Connected.
+        self._last_ts_us = -1.0
+        self._last_payload_ok = False
+        # update() runs on a background worker; the lock keeps it from
+        # interleaving with mode transitions or direct update() calls.
+        self._update_lock = threading.Lock()
+        self._teleop_active = threading.Event()
+        self._sample_ready = threading.Event()
+        self._closed = threading.Event()
+        self._update_period_s = QuestNavConstants.UPDATE_PERIOD_S
 
         ## Start the server
         self._nt_instance.startServer(QuestNavConstants.SERVER_NAME)
@@ -39,8 +77,16 @@ class QuestNavNtBridge:
         ).subscribe(0)
         self._version_sub = input_table.getIntegerTopic("version").subscribe(0)
 
-        self._pose3d_pub = output_table.getStructTopic("Pose3d", Pose3d).publish()
         self._pose2d_pub = output_table.getStructTopic("Pose2d", Pose2d).publish()
+        self._pose_array_pub = output_table.getDoubleArrayTopic(
+            "Pose2dArray"
+        ).publish()
+        # Only announce the Pose3d topic when it will actually carry values.
+        self._pose3d_pub: ntcore.StructPublisher | None = None
+        self._set_pose3d: Callable[[Pose3d], None] | None = None
+        if QuestNavConstants.PUBLISH_POSE3D:
+            self._pose3d_pub = output_table.getStructTopic("Pose3d", Pose3d).publish()
+            self._set_pose3d = self._pose3d_pub.set
         self._connected_pub = output_table.getBooleanTopic("Connected").publish()
         self._data_age_pub = output_table.getDoubleTopic("DataAgeSec").publish()
         self._tracking_status_pub = output_table.getIntegerTopic(
@@ -62,6 +108,58 @@ class QuestNavNtBridge:
             "LastTimestampUs"
         ).publish()
 
+        # Bound .get/.set methods, resolved once so update() skips the
+        # attribute lookups on every call.
+        input_subs = (
+            self._timestamp_sub,
+            self._position_sub,
+            self._quaternion_sub,
+            self._euler_sub,
+            self._battery_sub,
+            self._tracking_status_sub,
+            self._version_sub,
+        )
+        self._subs_get = tuple(sub.get for sub in input_subs)
+
+        # Where available, every input topic is drained with one readQueue()
+        # call per update instead of seven get() calls into ntcore. The poller
+        # only exists while teleop is active (see _open_input_poller) so its
+        # queue can't pile up while nothing drains it. Older ntcore builds
+        # keep the per-subscriber getters.
+        self._input_multi_sub: ntcore.MultiSubscriber | None = None
+        self._input_poller: ntcore.NetworkTableListenerPoller | None = None
+        # Topic handle -> (value slot, NT type the typed subscriber expects).
+        self._input_slots: dict[int, tuple[int, ntcore.NetworkTableType]] = {}
+        self._input_values: list[Any] = []
+        if hasattr(ntcore, "MultiSubscriber"):
+            self._input_multi_sub = ntcore.MultiSubscriber(
+                self._nt_instance, [input_table.getPath() + "/"]
+            )
+            input_types = (
+                ntcore.NetworkTableType.kDouble,
+                ntcore.NetworkTableType.kDoubleArray,
+                ntcore.NetworkTableType.kFloatArray,
+                ntcore.NetworkTableType.kFloatArray,
+                ntcore.NetworkTableType.kDouble,
+                ntcore.NetworkTableType.kInteger,
+                ntcore.NetworkTableType.kInteger,
+            )
+            self._input_slots = {
+                sub.getTopic().getHandle(): (i, nt_type)
+                for i, (sub, nt_type) in enumerate(zip(input_subs, input_types))
+            }
+        self._set_tracking_status = self._tracking_status_pub.set
+        self._set_battery = self._battery_pub.set
+        self._set_version = self._version_pub.set
+        self._set_raw_position = self._raw_position_pub.set
+        self._set_raw_euler = self._raw_euler_pub.set
+        self._set_raw_quaternion = self._raw_quaternion_pub.set
+        self._set_last_timestamp = self._last_timestamp_pub.set
+        self._set_connected = self._connected_pub.set
+        self._set_data_age = self._data_age_pub.set
+        self._set_pose2d = self._pose2d_pub.set
+        self._set_pose_array = self._pose_array_pub.set
+
         self._connected_pub.set(False)
         self._data_age_pub.set(-1.0)
         self._teleop_active_pub.set(False)
@@ -69,69 +167,210 @@ class QuestNavNtBridge:
         # Create + publish a Field2d for AdvantageScope
         self._field = wpilib.Field2d()
         wpilib.SmartDashboard.putData("QuestNavField", self._field)
+        self._set_field_pose = self._field.setRobotPose
         
         #Immediately publish a default pose to ensure the topic is populated and subscribers can get an initial value
         self._publish_default_start_pose()
 
+        # Wake the worker only when the Quest publishes a new timestamp.
+        self._sample_listener = ntcore.NetworkTableListener.createListener(
+            self._timestamp_sub, ntcore.EventFlags.kValueAll, self._on_sample
+        )
+        self._worker = threading.Thread(
+            target=self._run, name="QuestNavNtBridge", daemon=True
+        )
+        self._worker.start()
+
+    def close(self) -> None:
+        """
+        Stop the worker thread and release its NT listener.
+
+        The robot never needs this (the bridge lives for the whole boot); it is
+        for simulation/test teardown that builds more than one bridge.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        # Wake the worker wherever it is parked so it sees _closed and exits.
+        self._teleop_active.set()
+        self._sample_ready.set()
+        self._worker.join()
+        self._sample_listener.close()
+        with self._update_lock:
+            self._close_input_poller()
+
     def on_teleop_enable(self) -> None:
-        self._teleop_active_pub.set(True)
-        self._connected_pub.set(False)
-        self._data_age_pub.set(-1.0)
-        
-        # Reset displayed pose to a reasonable field-relative start position for 2026.
-        self._publish_default_start_pose()
+        with self._update_lock:
+            self._teleop_active_pub.set(True)
+            self._connected_pub.set(False)
+            self._data_age_pub.set(-1.0)
+            self._last_ts_us = -1.0
+            self._open_input_poller()
+
+            # Reset displayed pose to a reasonable field-relative start position for 2026.
+            self._publish_default_start_pose()
+            self._teleop_active.set()
 
     def on_teleop_disable(self) -> None:
-        self._teleop_active_pub.set(False)
-        self._connected_pub.set(False)
+        with self._update_lock:
+            self._teleop_active.clear()
+            self._close_input_poller()
+            self._teleop_active_pub.set(False)
+            self._connected_pub.set(False)
 
     def update(self, now_s: float | None = None) -> None:
-        timestamp_now_s = time.monotonic() if now_s is None else now_s
+        with self._update_lock:
+            self._update(now_s)
+
+    def _open_input_poller(self) -> None:
+        if self._input_multi_sub is None or self._input_poller is not None:
+            return
+        # Same defaults the subscribers were created with; kImmediate then
+        # seeds the current value of every existing input topic.
+        self._input_values = [0.0, [], [], [], 0.0, 0, 0]
+        self._input_poller = ntcore.NetworkTableListenerPoller(self._nt_instance)
+        self._input_poller.addListener(
+            self._input_multi_sub,
+            ntcore.EventFlags.kValueAll | ntcore.EventFlags.kImmediate,
+        )
+
+    def _close_input_poller(self) -> None:
+        if self._input_poller is not None:
+            self._input_poller.close()
+            self._input_poller = None
+
+    def _on_sample(self, _event: ntcore.Event) -> None:
+        self._sample_ready.set()
+
+    def _run(self) -> None:
+        while True:
+            self._teleop_active.wait()
+            # Time out so DataAgeSec/Connected still advance if the Quest goes quiet.
+            self._sample_ready.wait(self._stale_timeout_s)
+            if self._closed.is_set():
+                return
+            self._sample_ready.clear()
+            started_s = time.monotonic()
+            with self._update_lock:
+                if self._teleop_active.is_set():
+                    # An escaped exception would silently kill the worker and
+                    # stop QuestNav publishing for the rest of the boot.
+                    try:
+                        self._update(None)
+                    except Exception as exc:
+                        self._warn_rate_limited(
+                            _WARN_UPDATE,
+                            f"QuestNav bridge update failed: {exc}",
+                            time.monotonic_ns(),
+                            error=True,
+                        )
+            # Samples arriving faster than the robot loop are coalesced into the
+            # next pass rather than each costing a full update.
+            remaining_s = self._update_period_s - (time.monotonic() - started_s)
+            if remaining_s > 0.0 and self._closed.wait(remaining_s):
+                return
+
+    def _update(self, now_s: float | None) -> None:
+        # Integer ns clock for rate limiting; seconds only for the data-age math.
+        now_ns = time.monotonic_ns() if now_s is None else int(now_s * 1_000_000_000)
+        timestamp_now_s = now_ns / 1_000_000_000
+        (
+            get_timestamp,
+            get_position,
+            get_quaternion,
+            get_euler,
+            get_battery,
+            get_tracking_status,
+            get_version,
+        ) = self._subs_get
+        poller = self._input_poller
         try:
-            timestamp_us = float(self._timestamp_sub.get())
-            position = list(self._position_sub.get())
-            quaternion = list(self._quaternion_sub.get())
-            euler = list(self._euler_sub.get())
-            battery_percent = float(self._battery_sub.get())
-            tracking_status = int(self._tracking_status_sub.get())
-            version = int(self._version_sub.get())
+            if poller is not None:
+                self._drain_input_queue(poller)
+                timestamp_us = float(self._input_values[0])
+            else:
+                timestamp_us = float(get_timestamp())
+            new_sample = timestamp_us <= 0.0 or timestamp_us != self._last_ts_us
+            if new_sample:
+                # Array values are used as delivered by NT; no defensive copies.
+                if poller is not None:
+                    (
+                        _,
+                        position,
+                        quaternion,
+                        euler,
+                        battery_raw,
+                        tracking_status_raw,
+                        version_raw,
+                    ) = self._input_values
+                else:
+                    position = get_position()
+                    quaternion = get_quaternion()
+                    euler = get_euler()
+                    battery_raw = get_battery()
+                    tracking_status_raw = get_tracking_status()
+                    version_raw = get_version()
+                battery_percent = float(battery_raw)
+                tracking_status = int(tracking_status_raw)
+                version = int(version_raw)
         except Exception as exc:
             self._warn_rate_limited(
-                "questnav_read",
+                _WARN_READ,
                 f"QuestNav NT read failed: {exc}",
-                timestamp_now_s,
+                now_ns,
             )
-            self._connected_pub.set(False)
-            self._data_age_pub.set(-1.0)
+            self._set_connected(False)
+            self._set_data_age(-1.0)
             return
 
-        self._tracking_status_pub.set(tracking_status)
-        self._battery_pub.set(battery_percent)
-        self._version_pub.set(version)
-        self._raw_position_pub.set(position)
-        self._raw_euler_pub.set(euler)
-        self._raw_quaternion_pub.set(quaternion)
-        self._last_timestamp_pub.set(timestamp_us)
+        if not new_sample:
+            # The Quest hasn't produced a new sample; only its age has changed.
+            data_age_s = timestamp_now_s - (timestamp_us / 1_000_000.0)
+            self._set_data_age(data_age_s)
+            self._set_connected(
+                self._last_payload_ok and 0.0 <= data_age_s <= self._stale_timeout_s
+            )
+            return
+
+        self._publish_raw(
+            timestamp_us,
+            position,
+            euler,
+            quaternion,
+            battery_percent,
+            tracking_status,
+            version,
+        )
 
         if timestamp_us > 0.0:
             data_age_s = timestamp_now_s - (timestamp_us / 1_000_000.0)
         else:
             data_age_s = -1.0
-        self._data_age_pub.set(data_age_s)
+        self._set_data_age(data_age_s)
 
         position_ok = self._is_expected_length(
-            "position", position, QuestNavConstants.POSITION_LEN, timestamp_now_s
+            "position",
+            _WARN_POSITION_LEN,
+            position,
+            QuestNavConstants.POSITION_LEN,
+            now_ns,
         )
         euler_ok = self._is_expected_length(
-            "eulerAngles", euler, QuestNavConstants.EULER_LEN, timestamp_now_s
+            "eulerAngles", _WARN_EULER_LEN, euler, QuestNavConstants.EULER_LEN, now_ns
         )
         quaternion_ok = self._is_expected_length(
-            "quaternion", quaternion, QuestNavConstants.QUAT_LEN, timestamp_now_s
+            "quaternion",
+            _WARN_QUAT_LEN,
+            quaternion,
+            QuestNavConstants.QUAT_LEN,
+            now_ns,
         )
         payload_ok = position_ok and euler_ok and quaternion_ok
+        self._last_ts_us = timestamp_us
+        self._last_payload_ok = payload_ok
         fresh = 0.0 <= data_age_s <= self._stale_timeout_s
         connected = payload_ok and fresh
-        self._connected_pub.set(connected)
+        self._set_connected(connected)
 
         if not payload_ok:
             return
@@ -140,74 +379,108 @@ class QuestNavNtBridge:
             pose3d = self._to_wpilib_pose(position, euler)
             pose2d = pose3d.toPose2d()
 
-            self._pose3d_pub.set(pose3d)
-            self._pose2d_pub.set(pose2d)
+            if self._set_pose3d is not None:
+                self._set_pose3d(pose3d)
+            self._set_pose2d(pose2d)
+            self._set_pose_array(
+                [pose2d.X(), pose2d.Y(), pose2d.rotation().radians()]
+            )
 
-            # Update Field2d visualization
-            self._field.setRobotPose(pose2d)
+            # Update Field2d visualization; nobody is watching outside teleop.
+            if self._teleop_active.is_set():
+                self._set_field_pose(pose2d)
             
         except Exception as exc:
             self._warn_rate_limited(
-                "questnav_pose",
+                _WARN_POSE,
                 f"QuestNav pose conversion failed: {exc}",
-                timestamp_now_s,
+                now_ns,
             )
-            self._connected_pub.set(False)
+            self._last_payload_ok = False
+            self._set_connected(False)
+
+    def _drain_input_queue(self, poller: ntcore.NetworkTableListenerPoller) -> None:
+        values = self._input_values
+        slots = self._input_slots
+        for event in poller.readQueue():
+            data = event.data
+            entry = slots.get(data.topic.getHandle())
+            if entry is None:
+                continue
+            slot, nt_type = entry
+            # Match the typed subscribers, which ignore mismatched values.
+            value = data.value
+            if value.type() == nt_type:
+                values[slot] = value.value()
+
+    def _publish_raw(
+        self,
+        timestamp_us: float,
+        position: Sequence[float],
+        euler: Sequence[float],
+        quaternion: Sequence[float],
+        battery_percent: float,
+        tracking_status: int,
+        version: int,
+    ) -> None:
+        self._set_tracking_status(tracking_status)
+        self._set_battery(battery_percent)
+        self._set_version(version)
+        self._set_raw_position(position)
+        self._set_raw_euler(euler)
+        self._set_raw_quaternion(quaternion)
+        self._set_last_timestamp(timestamp_us)
 
     def _to_wpilib_pose(
         self, position: Sequence[float], euler: Sequence[float]
     ) -> Pose3d:
-        x = float(position[0])
-        y = float(position[1])
-        z = float(position[2])
-
-        roll_deg = float(euler[0])
-        pitch_deg = float(euler[1])
-        yaw_deg = float(euler[2])
+        # NT double/float arrays already arrive as Python floats.
+        x, y, z = position
+        roll_deg, pitch_deg, yaw_deg = euler
 
         translation = Translation3d(-z, x, y)
-        rotation = Rotation3d.fromDegrees(-(pitch_deg + 90.0), -roll_deg, yaw_deg)
+        rotation = Rotation3d(
+            -(pitch_deg + 90.0) * _DEG_TO_RAD,
+            -roll_deg * _DEG_TO_RAD,
+            yaw_deg * _DEG_TO_RAD,
+        )
         return Pose3d(translation, rotation)
 
     def _is_expected_length(
         self,
         name: str,
+        warn_slot: int,
         values: Sequence[float],
         expected_len: int,
-        now_s: float,
+        now_ns: int,
     ) -> bool:
         if len(values) == expected_len:
             return True
         self._warn_rate_limited(
-            f"questnav_{name}_len",
+            warn_slot,
             f"QuestNav '{name}' expected len={expected_len}, got len={len(values)}",
-            now_s,
+            now_ns,
         )
         return False
 
-    def _warn_rate_limited(self, key: str, message: str, now_s: float) -> None:
-        last_time_s = self._last_warning_s.get(key)
-        if last_time_s is not None and (now_s - last_time_s) < self._warning_interval_s:
+    def _warn_rate_limited(
+        self, slot: int, message: str, now_ns: int, error: bool = False
+    ) -> None:
+        if (now_ns - self._last_warning_ns[slot]) < self._warning_interval_ns:
             return
-        self._last_warning_s[key] = now_s
-        wpilib.reportWarning(message, False)
+        self._last_warning_ns[slot] = now_ns
+        if error:
+            wpilib.reportError(message, False)
+        else:
+            wpilib.reportWarning(message, False)
 
     def _publish_default_start_pose(self) -> None:
-        """
-        Reasonable REBUILT 2026 default in WPILib/AdvantageScope 'Blue Wall' coordinates:
-          x=1.00m, y=fieldWidth/2, heading=0deg (facing +X, toward red).
-        """
-        field_width_m = 8.07  # from 2026 manual (~8.07m)
-        x_m = 1.00
-        y_m = field_width_m / 2.0
-        heading = Rotation2d.fromDegrees(0.0)
-
-        pose2d = Pose2d(x_m, y_m, heading)
-        pose3d = Pose3d(Translation3d(x_m, y_m, 0.0), Rotation3d(0.0, 0.0, heading.radians()))
-
-        self._pose2d_pub.set(pose2d)
-        self._pose3d_pub.set(pose3d)
+        """Publish the module-level default start pose (see _DEFAULT_POSE2D)."""
+        self._pose2d_pub.set(_DEFAULT_POSE2D)
+        self._pose_array_pub.set(_DEFAULT_POSE_ARRAY)
+        if self._set_pose3d is not None:
+            self._set_pose3d(_DEFAULT_POSE3D)
         
         # Also initialize the Field2d pose
         if hasattr(self, "_field"):
-            self._field.setRobotPose(pose2d)
\ No newline at end of file
+            self._field.setRobotPose(_DEFAULT_POSE2D)
\ No newline at end of file
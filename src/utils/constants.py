@@ -20,6 +20,8 @@ class DriveConstants:
         BACK_LEFT,
         BACK_RIGHT,
     )
+    # (drive_id, steer_id) per module, same order as MODULES.
+    MODULE_IDS = tuple((m.drive_motor_id, m.steer_motor_id) for m in MODULES)
 
     CANBUS_NAME = "rio"
 
@@ -40,6 +42,12 @@ class QuestNavConstants:
     OUTPUT_TABLE = "AdvantageScope/QuestNav"
 
     STALE_TIMEOUT_S = 0.25
+    # Background bridge updates are capped to one per robot loop (20 ms).
+    UPDATE_PERIOD_S = 0.02
+
+    # Pose3d struct publishing is for debugging only; Pose2dArray
+    # ([x_m, y_m, heading_rad]) is always published.
+    PUBLISH_POSE3D = False
 
     POSITION_LEN = 3
     EULER_LEN = 3